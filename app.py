@@ -2,13 +2,36 @@
 
 import os
 import asyncio
-import json
+import itertools
 import logging
+import time
+from dataclasses import asdict, dataclass, field, fields, replace
 from datetime import datetime, timedelta
 import nats
 from nats.aio.client import Client as NATS
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    import json
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj, default=asdict).encode()
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Load environment variables
 load_dotenv()
 
@@ -23,31 +46,124 @@ logger = logging.getLogger(__name__)
 NATS_URL = os.environ.get('NATS_URL', 'nats://localhost:4222')
 NATS_USER = os.environ.get('NATS_USER')
 NATS_PASSWORD = os.environ.get('NATS_PASSWORD')
+REDIS_URL = os.environ.get('REDIS_URL')
+TENANT_CACHE_TTL = int(os.environ.get('TENANT_CACHE_TTL', 300))  # seconds
+
+# Replicas share a queue group so each request is handled by exactly one of them
+QUEUE_GROUP = 'tenant-service'
+
+# Maximum number of tenant requests handled concurrently
+WORKER_POOL_SIZE = 64
+
+
+@dataclass(slots=True)
+class Settings:
+    """Per-tenant configuration"""
+    claimmd_accounts: list[dict] = field(default_factory=list)
+    features: list[str] = field(default_factory=list)
+
+SETTINGS_FIELDS = frozenset(f.name for f in fields(Settings))
+
+def _validate_settings(values):
+    """Check client-supplied settings against the Settings fields, raising ValueError"""
+    if not isinstance(values, dict):
+        raise ValueError('settings must be an object')
+    unknown = set(values) - SETTINGS_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+    features = values.get('features', [])
+    if not isinstance(features, list) or not all(isinstance(f, str) for f in features):
+        raise ValueError('features must be a list of strings')
+    accounts = values.get('claimmd_accounts', [])
+    if not isinstance(accounts, list) or not all(isinstance(a, dict) for a in accounts):
+        raise ValueError('claimmd_accounts must be a list of objects')
+
+
+@dataclass(slots=True)
+class Tenant:
+    """Tenant organization record"""
+    id: str
+    name: str
+    status: str
+    settings: Settings
+    created_at: str
+
+
+@dataclass
+class Tenants:
+    """Tenant rows with a status column for stats and each row's serialized JSON"""
+    statuses: list[str] = field(default_factory=list)
+    records: list[Tenant] = field(default_factory=list)
+    index: dict[str, int] = field(default_factory=dict)
+    per_tenant_json: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def from_records(cls, records):
+        tenants = cls()
+        for record in records:
+            tenants.put(record)
+        return tenants
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, tenant_id):
+        return tenant_id in self.index
+
+    def __getitem__(self, tenant_id):
+        return self.records[self.index[tenant_id]]
+
+    def get(self, tenant_id):
+        row = self.index.get(tenant_id)
+        return None if row is None else self.records[row]
+
+    def values(self):
+        return iter(self.records)
+
+    def put(self, tenant):
+        """Insert or refresh a tenant row, re-serializing only that row"""
+        tenant_id = tenant.id
+        row = self.index.get(tenant_id)
+        if row is None:
+            self.index[tenant_id] = len(self.records)
+            self.statuses.append(tenant.status)
+            self.records.append(tenant)
+        else:
+            self.statuses[row] = tenant.status
+            self.records[row] = tenant
+        self.per_tenant_json[tenant_id] = _dumps(tenant)
+
+    def to_json(self):
+        """JSON array of all tenants assembled from the per-row blobs"""
+        return b'[' + b','.join(self.per_tenant_json.values()) + b']'
+
+    def count_status(self, status):
+        return self.statuses.count(status)
 
 # Mock tenant database (in production, this would come from MongoDB via htpi-mongodb-service)
-MOCK_TENANTS = {
-    'tenant-001': {
-        'id': 'tenant-001',
-        'name': 'Mercy General Hospital',
-        'status': 'active',
-        'settings': {
-            'claimmd_accounts': [
+MOCK_TENANTS = Tenants.from_records([
+    Tenant(
+        id='tenant-001',
+        name='Mercy General Hospital',
+        status='active',
+        settings=Settings(
+            claimmd_accounts=[
                 {
                     'id': 'claimmd-001',
                     'name': 'Primary Account',
                     'api_key': 'encrypted_key_here'
                 }
             ],
-            'features': ['patients', 'claims', 'insurance', 'encounters']
-        },
-        'created_at': '2024-01-01T00:00:00Z'
-    },
-    'tenant-002': {
-        'id': 'tenant-002',
-        'name': 'Springfield Clinic',
-        'status': 'active',
-        'settings': {
-            'claimmd_accounts': [
+            features=['patients', 'claims', 'insurance', 'encounters']
+        ),
+        created_at='2024-01-01T00:00:00Z'
+    ),
+    Tenant(
+        id='tenant-002',
+        name='Springfield Clinic',
+        status='active',
+        settings=Settings(
+            claimmd_accounts=[
                 {
                     'id': 'claimmd-002',
                     'name': 'Main Account',
@@ -59,11 +175,11 @@ MOCK_TENANTS = {
                     'api_key': 'encrypted_key_here'
                 }
             ],
-            'features': ['patients', 'claims', 'insurance']
-        },
-        'created_at': '2024-01-15T00:00:00Z'
-    }
-}
+            features=['patients', 'claims', 'insurance']
+        ),
+        created_at='2024-01-15T00:00:00Z'
+    )
+])
 
 # User-tenant mappings (in production, would be in MongoDB)
 USER_TENANT_ACCESS = {
@@ -71,11 +187,90 @@ USER_TENANT_ACCESS = {
     'user-cust-002': ['tenant-001'],  # john@example.com
     'user-admin-001': '*'  # admin@htpi.com can access all
 }
+# Store grants as frozensets so access checks are O(1) membership tests
+USER_TENANT_ACCESS = {k: (v if v == '*' else frozenset(v)) for k, v in USER_TENANT_ACCESS.items()}
+
+
+def _build_tenant_user_access(user_access):
+    index = {}
+    for user_id, tenants in user_access.items():
+        for tenant_id in (('*',) if tenants == '*' else tenants):
+            index.setdefault(tenant_id, set()).add(user_id)
+    return index
+
+# Reverse of USER_TENANT_ACCESS (tenant -> users); wildcard users are indexed under '*'
+TENANT_USER_ACCESS: dict[str, set[str]] = _build_tenant_user_access(USER_TENANT_ACCESS)
+
+# Redis cache keys
+TENANT_LIST_KEY = 'tenant:list'
+
+
+def _tenant_key(tenant_id):
+    return f"tenant:{tenant_id}"
+
+
+def _user_tenants_key(user_id):
+    return f"user:{user_id}:tenants"
+
+# Response envelopes; clientId and tenant bytes are spliced in already JSON-encoded
+_TENANT_OK_TMPL = b'{"success":true,"clientId":%b,"tenant":%b}'
+_TENANTS_OK_TMPL = b'{"success":true,"clientId":%b,"tenants":%b}'
+_ERR_NOT_FOUND_TMPL = b'{"success":false,"error":"Tenant not found","clientId":%b}'
+
+
+def _utc_timestamp():
+    """Current UTC time as ISO 8601 with second precision, e.g. 2024-01-01T00:00:00Z"""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def _admin_subject(client_id):
+    return f"admin.tenant.response.{client_id}" if client_id else None
+
+# Portals allowed to receive tenant responses, with their reply subject prefixes
+PORTALS = ('customer', 'admin', 'provider')
+PORTAL_TENANTS_PREFIX = {p: f"{p}.tenants.response." for p in PORTALS}
+PORTAL_TENANT_PREFIX = {p: f"{p}.tenant.response." for p in PORTALS}
+
+
+def _is_subject_token(value):
+    """True if value can be used as a single NATS subject token"""
+    return (isinstance(value, str) and value != ''
+            and not any(c.isspace() or c in '.*>' for c in value))
+
 
 class TenantService:
     def __init__(self):
         self.nc = None
+        self.redis = None
+        self._list_cache: bytes | None = None
+        self._tenant_version = 0
+        self._sem = asyncio.Semaphore(WORKER_POOL_SIZE)
+        self._tasks = set()
+        self._tenant_seq = itertools.count(len(MOCK_TENANTS) + 1)
+        self._access_epoch = 0
+        # Users whose cached grant set could not be dropped -> monotonic time it expires
+        self._stale_access: dict[str, float] = {}
+        self._routes = {
+            "htpi.tenant.create": self.handle_create_tenant,
+            "htpi.tenant.update": self.handle_update_tenant,
+            "htpi.tenant.list": self.handle_list_tenants,
+            "htpi.tenant.get": self.handle_get_tenant,
+            "htpi.tenant.list.for.user": self.handle_list_user_tenants,
+            "htpi.tenant.verify.access": self.handle_verify_access,
+            "htpi.tenant.users.for.tenant": self.handle_list_tenant_users,
+            "htpi.tenant.service.ping": self.handle_ping,
+        }
         
+    def _connect_redis(self):
+        """Create the Redis cache client when REDIS_URL is configured"""
+        if not REDIS_URL:
+            return
+        if aioredis is None:
+            logger.warning("REDIS_URL is set but the redis package is not installed; caching disabled")
+            return
+        self.redis = aioredis.from_url(REDIS_URL)
+        logger.info("Tenant cache enabled via Redis")
+    
     async def connect(self):
         """Connect to NATS"""
         try:
@@ -93,20 +288,12 @@ class TenantService:
             self.nc = await nats.connect(**options)
             logger.info(f"Connected to NATS at {NATS_URL}")
             
-            # Subscribe to tenant requests
-            await self.nc.subscribe("htpi.tenant.create", cb=self.handle_create_tenant)
-            await self.nc.subscribe("htpi.tenant.update", cb=self.handle_update_tenant)
-            await self.nc.subscribe("htpi.tenant.list", cb=self.handle_list_tenants)
-            await self.nc.subscribe("htpi.tenant.get", cb=self.handle_get_tenant)
-            await self.nc.subscribe("htpi.tenant.list.for.user", cb=self.handle_list_user_tenants)
-            await self.nc.subscribe("htpi.tenant.verify.access", cb=self.handle_verify_access)
+            # Subscribe to tenant and ping requests; _route picks the handler by subject
+            await self.nc.subscribe("htpi.tenant.>", queue=QUEUE_GROUP, cb=self._route)
             
             # Subscribe to health check requests
-            await self.nc.subscribe("health.check", cb=self.handle_health_check)
-            await self.nc.subscribe("htpi-tenant-service.health", cb=self.handle_health_check)
-            
-            # Subscribe to ping requests
-            await self.nc.subscribe("htpi.tenant.service.ping", cb=self.handle_ping)
+            await self.nc.subscribe("health.check", queue=QUEUE_GROUP, cb=self.handle_health_check)
+            await self.nc.subscribe("htpi-tenant-service.health", queue=QUEUE_GROUP, cb=self.handle_health_check)
             
             # Register with monitor service
             await self._register_with_monitor()
@@ -119,132 +306,345 @@ class TenantService:
             logger.error(f"Failed to connect to NATS: {str(e)}")
             raise
     
+    async def _dispatch(self, handler, msg):
+        """Run handler as a pool task once a worker slot is free"""
+        await self._sem.acquire()
+        task = asyncio.create_task(handler(msg))
+        self._tasks.add(task)
+        task.add_done_callback(self._release_worker)
+    
+    def _release_worker(self, task):
+        self._tasks.discard(task)
+        self._sem.release()
+    
+    async def _route(self, msg):
+        """Dispatch a htpi.tenant.> message to the handler for its subject"""
+        handler = self._routes.get(msg.subject)
+        if handler:
+            await self._dispatch(handler, msg)
+        else:
+            logger.debug(f"No handler for subject {msg.subject}")
+    
+    async def _reply(self, msg, channel, payload):
+        """Answer on the request's inbox when it has one, else on channel"""
+        subject = msg.reply or channel
+        if subject:
+            await self.nc.publish(subject, payload)
+        else:
+            logger.warning(f"No reply subject for message on {msg.subject}; response dropped")
+    
+    async def _cache_get(self, key):
+        """Read a key from Redis, treating any failure as a cache miss"""
+        if not self.redis:
+            return None
+        try:
+            return await self.redis.get(key)
+        except Exception as e:
+            logger.warning(f"Redis get failed for {key}: {str(e)}")
+            return None
+    
+    async def _cache_set(self, key, value):
+        """Store a value in Redis with the tenant cache TTL"""
+        if not self.redis:
+            return
+        try:
+            await self.redis.set(key, value, ex=TENANT_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Redis set failed for {key}: {str(e)}")
+    
+    async def _cache_fill(self, key, value, version):
+        """Populate a cache key after a miss, dropping it again if a tenant write raced the fill"""
+        await self._cache_set(key, value)
+        if self.redis and self._tenant_version != version:
+            try:
+                await self.redis.delete(key)
+            except Exception as e:
+                logger.warning(f"Redis delete failed for {key}: {str(e)}")
+    
+    async def _write_through_tenant(self, tenant_id):
+        """Refresh a tenant's cached JSON after a write and drop the cached listing"""
+        if not self.redis:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(_tenant_key(tenant_id), MOCK_TENANTS.per_tenant_json[tenant_id], ex=TENANT_CACHE_TTL)
+                pipe.delete(TENANT_LIST_KEY)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis write-through failed for tenant {tenant_id}: {str(e)}")
+    
+    async def _get_tenant_json(self, tenant_id):
+        """Serialized tenant record, reading through the Redis cache when enabled"""
+        version = self._tenant_version
+        cached = await self._cache_get(_tenant_key(tenant_id))
+        if cached:
+            return cached
+        tenant_json = MOCK_TENANTS.per_tenant_json.get(tenant_id)
+        if tenant_json is not None:
+            await self._cache_fill(_tenant_key(tenant_id), tenant_json, version)
+        return tenant_json
+    
+    async def _has_access(self, user_id, tenant_id):
+        """Check a user-tenant grant, using the user's cached tenant set when present"""
+        key = _user_tenants_key(user_id)
+        use_cache = self.redis is not None and not self._access_cache_stale(user_id)
+        if use_cache:
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.exists(key)
+                    pipe.sismember(key, tenant_id)
+                    pipe.sismember(key, '*')
+                    exists, member, wildcard = await pipe.execute()
+                if exists:
+                    return bool(member or wildcard)
+            except Exception as e:
+                logger.warning(f"Redis access check failed for {user_id}: {str(e)}")
+        
+        epoch = self._access_epoch
+        access = USER_TENANT_ACCESS.get(user_id, frozenset())
+        if use_cache and access:
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.sadd(key, *(['*'] if access == '*' else access))
+                    pipe.expire(key, TENANT_CACHE_TTL)
+                    await pipe.execute()
+                # A grant or revoke landed while filling; don't leave the old set behind
+                if self._access_epoch != epoch:
+                    await self.redis.delete(key)
+            except Exception as e:
+                logger.warning(f"Redis access cache fill failed for {user_id}: {str(e)}")
+        return access == '*' or tenant_id in access
+    
+    def _access_cache_stale(self, user_id):
+        """Whether a user's cached grant set may predate a grant or revoke"""
+        expires = self._stale_access.get(user_id)
+        if expires is None:
+            return False
+        if time.monotonic() < expires:
+            return True
+        del self._stale_access[user_id]
+        return False
+    
+    async def _invalidate_user_access(self, user_id):
+        """Drop a user's cached grant set so the next access check reloads it.
+        
+        The access maps are already updated and stay authoritative; if Redis can't
+        drop the key, checks for this user bypass the cache until it would expire.
+        """
+        self._access_epoch += 1
+        if not self.redis:
+            return
+        try:
+            await self.redis.delete(_user_tenants_key(user_id))
+        except Exception as e:
+            logger.error(f"Redis access invalidation failed for {user_id}: {str(e)}")
+            self._stale_access[user_id] = time.monotonic() + TENANT_CACHE_TTL
+    
+    async def _grant(self, user_id, tenant_id):
+        """Give a user access to a tenant ('*' for all), updating both access maps"""
+        current = USER_TENANT_ACCESS.get(user_id, frozenset())
+        if current != '*':
+            if tenant_id == '*':
+                for tid in current:
+                    TENANT_USER_ACCESS.get(tid, set()).discard(user_id)
+                USER_TENANT_ACCESS[user_id] = '*'
+            else:
+                USER_TENANT_ACCESS[user_id] = current | {tenant_id}
+            TENANT_USER_ACCESS.setdefault(tenant_id, set()).add(user_id)
+        await self._invalidate_user_access(user_id)
+    
+    async def _revoke(self, user_id, tenant_id):
+        """Remove a user's access to a tenant ('*' drops a wildcard grant)"""
+        current = USER_TENANT_ACCESS.get(user_id)
+        if current == '*':
+            if tenant_id != '*':
+                raise ValueError(f"User {user_id} has wildcard access; revoke '*' instead")
+            USER_TENANT_ACCESS[user_id] = frozenset()
+        elif current is not None:
+            USER_TENANT_ACCESS[user_id] = current - {tenant_id}
+        TENANT_USER_ACCESS.get(tenant_id, set()).discard(user_id)
+        await self._invalidate_user_access(user_id)
+    
     async def handle_create_tenant(self, msg):
         """Handle tenant creation requests"""
+        client_id = None
         try:
-            data = json.loads(msg.data.decode())
+            data = _loads(msg.data)
             client_id = data.get('clientId')
+            if not await self._check_client_id(msg, client_id):
+                return
+            
+            features = data.get('features', ['patients', 'claims', 'insurance'])
+            _validate_settings({'features': features})
             
             # Create new tenant
-            tenant_id = f"tenant-{len(MOCK_TENANTS) + 1:03d}"
-            new_tenant = {
-                'id': tenant_id,
-                'name': data.get('name'),
-                'status': 'active',
-                'settings': {
-                    'claimmd_accounts': [],
-                    'features': data.get('features', ['patients', 'claims', 'insurance'])
-                },
-                'created_at': datetime.utcnow().isoformat()
-            }
+            tenant_id = f"tenant-{next(self._tenant_seq):03d}"
+            new_tenant = Tenant(
+                id=tenant_id,
+                name=data.get('name'),
+                status='active',
+                settings=Settings(features=features),
+                created_at=_utc_timestamp()
+            )
             
             # Add to mock database
-            MOCK_TENANTS[tenant_id] = new_tenant
+            MOCK_TENANTS.put(new_tenant)
+            self._invalidate_list_cache()
+            await self._write_through_tenant(tenant_id)
+            # Readers that fetched the old listing during the write-through must not keep it
+            self._invalidate_list_cache()
             
             # Send response
-            await self.nc.publish(f"admin.tenant.response.{client_id}", 
-                json.dumps({
-                    'success': True,
-                    'tenant': new_tenant,
-                    'clientId': client_id
-                }).encode())
+            await self._reply(msg, _admin_subject(client_id), 
+                _TENANT_OK_TMPL % (_dumps(client_id), MOCK_TENANTS.per_tenant_json[tenant_id]))
             
             logger.info(f"Created tenant: {tenant_id}")
             
         except Exception as e:
             logger.error(f"Error in handle_create_tenant: {str(e)}")
-            await self.nc.publish(f"admin.tenant.response.{data.get('clientId')}", 
-                json.dumps({
+            await self._reply(msg, _admin_subject(client_id), 
+                _dumps({
                     'success': False,
                     'error': str(e),
-                    'clientId': data.get('clientId')
-                }).encode())
+                    'clientId': client_id
+                }))
     
     async def handle_update_tenant(self, msg):
         """Handle tenant update requests"""
+        client_id = None
         try:
-            data = json.loads(msg.data.decode())
+            data = _loads(msg.data)
             tenant_id = data.get('tenantId')
             client_id = data.get('clientId')
+            if not await self._check_client_id(msg, client_id):
+                return
             
             if tenant_id not in MOCK_TENANTS:
-                await self.nc.publish(f"admin.tenant.response.{client_id}", 
-                    json.dumps({
-                        'success': False,
-                        'error': 'Tenant not found',
-                        'clientId': client_id
-                    }).encode())
+                await self._reply(msg, _admin_subject(client_id), 
+                    _ERR_NOT_FOUND_TMPL % _dumps(client_id))
                 return
             
             # Update tenant
             tenant = MOCK_TENANTS[tenant_id]
+            settings = tenant.settings
+            if 'settings' in data:
+                _validate_settings(data['settings'])
+                settings = replace(settings, **data['settings'])
             if 'name' in data:
-                tenant['name'] = data['name']
+                tenant.name = data['name']
             if 'status' in data:
-                tenant['status'] = data['status']
-            if 'settings' in data:
-                tenant['settings'].update(data['settings'])
+                tenant.status = data['status']
+            tenant.settings = settings
+            MOCK_TENANTS.put(tenant)
+            self._invalidate_list_cache()
+            await self._write_through_tenant(tenant_id)
+            # Readers that fetched the old listing during the write-through must not keep it
+            self._invalidate_list_cache()
             
             # Send response
-            await self.nc.publish(f"admin.tenant.response.{client_id}", 
-                json.dumps({
-                    'success': True,
-                    'tenant': tenant,
-                    'clientId': client_id
-                }).encode())
+            await self._reply(msg, _admin_subject(client_id), 
+                _TENANT_OK_TMPL % (_dumps(client_id), MOCK_TENANTS.per_tenant_json[tenant_id]))
             
             logger.info(f"Updated tenant: {tenant_id}")
             
         except Exception as e:
             logger.error(f"Error in handle_update_tenant: {str(e)}")
+            await self._reply(msg, _admin_subject(client_id), 
+                _dumps({
+                    'success': False,
+                    'error': str(e),
+                    'clientId': client_id
+                }))
     
     async def handle_list_tenants(self, msg):
         """Handle list all tenants requests (admin only)"""
         try:
-            data = json.loads(msg.data.decode())
+            data = _loads(msg.data)
             client_id = data.get('clientId')
+            if not await self._check_client_id(msg, client_id):
+                return
             
             # Return all tenants for admin
-            tenants = list(MOCK_TENANTS.values())
-            
-            await self.nc.publish(f"admin.tenant.response.{client_id}", 
-                json.dumps({
-                    'success': True,
-                    'tenants': tenants,
-                    'clientId': client_id
-                }).encode())
+            await self._reply(msg, _admin_subject(client_id), 
+                _TENANTS_OK_TMPL % (_dumps(client_id), await self._serialize_all_tenants()))
             
         except Exception as e:
             logger.error(f"Error in handle_list_tenants: {str(e)}")
     
+    def _invalidate_list_cache(self):
+        self._list_cache = None
+        self._tenant_version += 1
+    
+    async def _serialize_all_tenants(self):
+        """Serialized list of all tenants, cached until the next create/update"""
+        if self._list_cache is not None:
+            return self._list_cache
+        version = self._tenant_version
+        cached = await self._cache_get(TENANT_LIST_KEY)
+        if cached:
+            # Keep it in process unless a write invalidated the listing meanwhile
+            if self._tenant_version == version:
+                self._list_cache = cached
+            return cached
+        self._list_cache = tenants_json = MOCK_TENANTS.to_json()
+        await self._cache_fill(TENANT_LIST_KEY, tenants_json, version)
+        return tenants_json
+    
+    async def _reject(self, msg, error, client_id):
+        """Refuse a malformed request, answering on its inbox when it has one"""
+        logger.warning(f"Rejected request on {msg.subject}: {error}")
+        if msg.reply:
+            await msg.respond(
+                _dumps({
+                    'success': False,
+                    'error': error,
+                    'clientId': client_id
+                }))
+    
+    async def _check_client_id(self, msg, client_id):
+        """Validate clientId for use in a response subject, rejecting the request if unusable.
+        
+        A missing clientId is fine for request/reply callers, who are answered on msg.reply.
+        """
+        if _is_subject_token(client_id) or (client_id is None and msg.reply):
+            return True
+        await self._reject(msg, 'Invalid clientId', client_id)
+        return False
+    
     async def handle_list_user_tenants(self, msg):
         """Handle list tenants for specific user"""
         try:
-            data = json.loads(msg.data.decode())
+            data = _loads(msg.data)
             user_id = data.get('userId')
             client_id = data.get('clientId')
             portal = data.get('portal', 'customer')
             
+            if portal not in PORTAL_TENANTS_PREFIX:
+                await self._reject(msg, f"Unknown portal: {portal}", client_id)
+                return
+            if not await self._check_client_id(msg, client_id):
+                return
+            
             # Get user's accessible tenants
-            access = USER_TENANT_ACCESS.get(user_id, [])
+            access = USER_TENANT_ACCESS.get(user_id, frozenset())
             
             if access == '*':
-                # Admin has access to all
-                tenants = list(MOCK_TENANTS.values())
+                # Admin has access to all; share the cached full listing
+                count = len(MOCK_TENANTS)
+                tenants_json = await self._serialize_all_tenants()
             else:
-                # Filter tenants by access
-                tenants = [MOCK_TENANTS[tid] for tid in access if tid in MOCK_TENANTS]
+                # Filter tenants by access, joining the per-tenant JSON blobs
+                per_tenant_json = MOCK_TENANTS.per_tenant_json
+                rows = [per_tenant_json[tid] for tid in sorted(access) if tid in per_tenant_json]
+                count = len(rows)
+                tenants_json = b'[' + b','.join(rows) + b']'
             
             # Send to appropriate portal channel
-            channel = f"{portal}.tenants.response.{client_id}"
-            await self.nc.publish(channel, 
-                json.dumps({
-                    'success': True,
-                    'tenants': tenants,
-                    'clientId': client_id
-                }).encode())
+            channel = PORTAL_TENANTS_PREFIX[portal] + client_id if client_id else None
+            await self._reply(msg, channel, 
+                _TENANTS_OK_TMPL % (_dumps(client_id), tenants_json))
             
-            logger.info(f"Listed {len(tenants)} tenants for user {user_id}")
+            logger.info(f"Listed {count} tenants for user {user_id}")
             
         except Exception as e:
             logger.error(f"Error in handle_list_user_tenants: {str(e)}")
@@ -252,31 +652,28 @@ class TenantService:
     async def handle_get_tenant(self, msg):
         """Handle get single tenant request"""
         try:
-            data = json.loads(msg.data.decode())
+            data = _loads(msg.data)
             tenant_id = data.get('tenantId')
             client_id = data.get('clientId')
             portal = data.get('portal', 'customer')
             
-            tenant = MOCK_TENANTS.get(tenant_id)
+            if portal not in PORTAL_TENANT_PREFIX:
+                await self._reject(msg, f"Unknown portal: {portal}", client_id)
+                return
+            if not await self._check_client_id(msg, client_id):
+                return
             
-            if not tenant:
-                channel = f"{portal}.tenant.response.{client_id}"
-                await self.nc.publish(channel, 
-                    json.dumps({
-                        'success': False,
-                        'error': 'Tenant not found',
-                        'clientId': client_id
-                    }).encode())
+            channel = PORTAL_TENANT_PREFIX[portal] + client_id if client_id else None
+            tenant_json = await self._get_tenant_json(tenant_id)
+            
+            if tenant_json is None:
+                await self._reply(msg, channel, 
+                    _ERR_NOT_FOUND_TMPL % _dumps(client_id))
                 return
             
             # Send tenant data
-            channel = f"{portal}.tenant.response.{client_id}"
-            await self.nc.publish(channel, 
-                json.dumps({
-                    'success': True,
-                    'tenant': tenant,
-                    'clientId': client_id
-                }).encode())
+            await self._reply(msg, channel, 
+                _TENANT_OK_TMPL % (_dumps(client_id), tenant_json))
             
         except Exception as e:
             logger.error(f"Error in handle_get_tenant: {str(e)}")
@@ -284,31 +681,58 @@ class TenantService:
     async def handle_verify_access(self, msg):
         """Verify user has access to a tenant"""
         try:
-            data = json.loads(msg.data.decode())
+            data = _loads(msg.data)
             user_id = data.get('userId')
             tenant_id = data.get('tenantId')
             
             # Check access
-            access = USER_TENANT_ACCESS.get(user_id, [])
-            has_access = access == '*' or tenant_id in access
+            has_access = await self._has_access(user_id, tenant_id)
             
-            await msg.respond(json.dumps({
+            await msg.respond(_dumps({
                 'hasAccess': has_access,
                 'userId': user_id,
                 'tenantId': tenant_id
-            }).encode())
+            }))
             
         except Exception as e:
             logger.error(f"Error in handle_verify_access: {str(e)}")
-            await msg.respond(json.dumps({
+            await msg.respond(_dumps({
                 'hasAccess': False,
                 'error': str(e)
-            }).encode())
+            }))
+    
+    async def handle_list_tenant_users(self, msg):
+        """Handle list users with access to a tenant (admin only)"""
+        try:
+            data = _loads(msg.data)
+            tenant_id = data.get('tenantId')
+            client_id = data.get('clientId')
+            if not await self._check_client_id(msg, client_id):
+                return
+            
+            if tenant_id not in MOCK_TENANTS:
+                await self._reply(msg, _admin_subject(client_id), 
+                    _ERR_NOT_FOUND_TMPL % _dumps(client_id))
+                return
+            
+            # Explicit grants plus users with wildcard access
+            users = TENANT_USER_ACCESS.get(tenant_id, set()) | TENANT_USER_ACCESS.get('*', set())
+            
+            await self._reply(msg, _admin_subject(client_id), 
+                _dumps({
+                    'success': True,
+                    'tenantId': tenant_id,
+                    'users': sorted(users),
+                    'clientId': client_id
+                }))
+            
+        except Exception as e:
+            logger.error(f"Error in handle_list_tenant_users: {str(e)}")
     
     async def handle_ping(self, msg):
         """Handle ping requests"""
         try:
-            data = json.loads(msg.data.decode())
+            data = _loads(msg.data)
             ping_id = data.get('pingId')
             client_id = data.get('clientId')
             
@@ -323,7 +747,7 @@ class TenantService:
             
             await self.nc.publish(
                 'services.pong.htpi-tenant-service',
-                json.dumps(pong_data).encode()
+                _dumps(pong_data)
             )
             
             logger.info(f"Sent pong response for ping {ping_id}")
@@ -337,7 +761,7 @@ class TenantService:
             # Parse request data
             request_data = {}
             try:
-                request_data = json.loads(msg.data.decode())
+                request_data = _loads(msg.data)
             except:
                 pass
             
@@ -354,7 +778,7 @@ class TenantService:
                 'timestamp': datetime.utcnow().isoformat(),
                 'stats': {
                     'total_tenants': len(MOCK_TENANTS),
-                    'active_tenants': len([t for t in MOCK_TENANTS.values() if t['status'] == 'active'])
+                    'active_tenants': MOCK_TENANTS.count_status('active')
                 }
             }
             
@@ -364,11 +788,11 @@ class TenantService:
                 # Send to admin health response channel
                 await self.nc.publish(
                     f"health.response.htpi-tenant-service",
-                    json.dumps(health_response).encode()
+                    _dumps(health_response)
                 )
             
             # Standard response
-            await msg.respond(json.dumps(health_response).encode())
+            await msg.respond(_dumps(health_response))
             
             logger.info(f"Health check response sent")
             
@@ -387,7 +811,7 @@ class TenantService:
                     "purpose": "tenant-management"
                 }
             }
-            await self.nc.publish("monitor.register", json.dumps(registration_data).encode())
+            await self.nc.publish("monitor.register", _dumps(registration_data))
             logger.info("Registered htpi-tenant-service with monitor service")
         except Exception as e:
             logger.error(f"Failed to register with monitor: {str(e)}")
@@ -407,12 +831,12 @@ class TenantService:
                             "healthy": True,
                             "connected_to_nats": True,
                             "total_tenants": len(MOCK_TENANTS),
-                            "active_tenants": len([t for t in MOCK_TENANTS.values() if t['status'] == 'active'])
+                            "active_tenants": MOCK_TENANTS.count_status('active')
                         }
                     }
                     await self.nc.publish(
                         "monitor.heartbeat.htpi-tenant-service", 
-                        json.dumps(heartbeat_data).encode()
+                        _dumps(heartbeat_data)
                     )
                     logger.debug("Sent heartbeat for htpi-tenant-service")
                 else:
@@ -428,6 +852,7 @@ class TenantService:
         """Run the service"""
         self.start_time = datetime.utcnow()
         
+        self._connect_redis()
         await self.connect()
         logger.info("Tenant service is running...")
         
@@ -438,6 +863,8 @@ class TenantService:
             pass
         finally:
             await self.nc.close()
+            if self.redis:
+                await self.redis.aclose()
 
 async def main():
     """Main entry point"""
@@ -445,4 +872,7 @@ async def main():
     await service.run()
 
 if __name__ == '__main__':
-    asyncio.run(main())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file